@@ -1,11 +1,14 @@
 # app.py
 
+import asyncio
 import os
-import socket
+import queue
+import sqlite3
 import subprocess
 import time
 import random
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from dotenv import load_dotenv
 import streamlit as st
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -18,24 +21,41 @@ from personaagent.tools import get_available_tools, with_sql_cursor
 
 def ensure_ollama_server(model_name: str = "qwen3:1.7b", port: int = 11434):
     """Make sure the Ollama server is running; if not, start it in background."""
-    try:
-        with socket.create_connection(("127.0.0.1", port), timeout=1):
+    host = os.environ.get("OLLAMA_HOST", f"http://127.0.0.1:{port}")
+    if "://" not in host:
+        host = f"http://{host}"
+
+    def is_ready() -> bool:
+        # /api/tags yang menjawab 200 berarti server benar-benar siap,
+        # bukan sekadar port yang sudah terbuka
+        try:
+            return httpx.get(f"{host}/api/tags", timeout=0.3).status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    if is_ready():
+        return
+    if "OLLAMA_HOST" in os.environ:
+        # host remote dikonfigurasi eksplisit; jangan start server lokal
+        raise RuntimeError(f"Ollama server at {host} is not reachable")
+
+    subprocess.Popen(
+        ["ollama", "run", model_name, "--serve"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        shell=(os.name == "nt"),
+        # izinkan beberapa request paralel dan jangan unload model di sela giliran
+        env={**os.environ, "OLLAMA_NUM_PARALLEL": "4", "OLLAMA_KEEP_ALIVE": "-1"},
+    )
+    # backoff eksponensial, total tunggu maksimal ~5 detik
+    delay, waited = 0.1, 0.0
+    while waited < 5.0:
+        time.sleep(delay)
+        waited += delay
+        if is_ready():
             return
-    except OSError:
-        subprocess.Popen(
-            ["ollama", "run", model_name, "--serve"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            shell=(os.name == "nt"),
-        )
-        # wait up to ~10 seconds for the server to come up
-        for _ in range(20):
-            try:
-                with socket.create_connection(("127.0.0.1", port), timeout=1):
-                    return
-            except OSError:
-                time.sleep(0.5)
-        raise RuntimeError(f"Failed to start Ollama server on port {port}")
+        delay = min(delay * 2, 1.6)
+    raise RuntimeError(f"Failed to start Ollama server on port {port}")
 
 # ensure Ollama is serving before anything else
 ensure_ollama_server()
@@ -71,6 +91,100 @@ def get_model() -> BaseChatModel:
 
 
 
+@st.cache_resource(show_spinner=False)
+def get_executor() -> ThreadPoolExecutor:
+    """Worker pool tunggal per proses untuk event loop agent.
+
+    Harus lewat st.cache_resource: app.py dieksekusi ulang tiap rerun, jadi
+    pool di level modul akan dibuat baru pada setiap pesan chat.
+    """
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def ask_stream(prompt: str, history, llm):
+    """Jalankan generator async ask() di worker thread, alirkan hasilnya ke UI."""
+    chunks: queue.Queue = queue.Queue()
+    done = object()
+
+    def run():
+        async def consume():
+            async for chunk in ask(prompt, history, llm):
+                chunks.put(chunk)
+
+        try:
+            asyncio.run(consume())
+        except BaseException as exc:
+            chunks.put(exc)
+        else:
+            chunks.put(done)
+
+    get_executor().submit(run)
+    while True:
+        item = chunks.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_schema_summary(db_mtime: float) -> list[tuple[str, int]]:
+    """Nama tabel + perkiraan jumlah baris, di-cache agar tidak di-scan tiap rerun.
+
+    Sidebar hanya butuh estimasi, jadi baca statistik planner (sqlite_stat1)
+    atau MAX(_ROWID_) alih-alih full scan count(*). db_mtime ikut sebagai key
+    supaya cache otomatis invalid saat file DB berubah.
+    """
+    with with_sql_cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type='table' AND name NOT LIKE 'sqlite_%';"
+        )
+        tables = [row[0] for row in cursor.fetchall()]
+        if not tables:
+            return []
+
+        # Statistik ANALYZE kalau ada: angka pertama kolom stat = jumlah baris
+        counts: dict[str, int] = {}
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name='sqlite_stat1';"
+        )
+        if cursor.fetchone():
+            cursor.execute("SELECT tbl, stat FROM sqlite_stat1;")
+            for tbl, stat in cursor.fetchall():
+                if tbl not in counts and stat:
+                    counts[tbl] = int(stat.split()[0])
+
+        # Sisanya diestimasi lewat MAX(_ROWID_) dalam satu statement UNION ALL
+        missing = [table for table in tables if table not in counts]
+        if missing:
+            parts = []
+            for table in missing:
+                # escape literal nama dan quote identifier tabel
+                name_literal = table.replace("'", "''")
+                safe_table = table.replace('"', '""')
+                parts.append(
+                    f"SELECT '{name_literal}', "
+                    f'COALESCE(MAX(_ROWID_), 0) FROM "{safe_table}"'
+                )
+            try:
+                cursor.execute(" UNION ALL ".join(parts))
+            except sqlite3.OperationalError:
+                # tabel WITHOUT ROWID tidak punya _ROWID_; fallback count(*)
+                parts = []
+                for table in missing:
+                    name_literal = table.replace("'", "''")
+                    safe_table = table.replace('"', '""')
+                    parts.append(
+                        f"SELECT '{name_literal}', count(*) FROM \"{safe_table}\""
+                    )
+                cursor.execute(" UNION ALL ".join(parts))
+            counts.update(cursor.fetchall())
+
+        return [(table, counts.get(table, 0)) for table in tables]
+
+
 def load_css(css_file):
     with open(css_file) as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
@@ -94,20 +208,9 @@ with st.sidebar:
     db_size = Config.Path.DATABASE_PATH.stat().st_size / (1024 * 1024)
     st.write(f"**Size:** {db_size:.2f} MB")
 
-    with with_sql_cursor() as cursor:
-        cursor.execute(
-            "SELECT name FROM sqlite_master "
-            "WHERE type='table' AND name NOT LIKE 'sqlite_%';"
-        )
-        tables = [row[0] for row in cursor.fetchall()]
-
-        st.write("**Tables:**")
-        for table in tables:
-            # escape dan quote nama tabel
-            safe_table = table.replace('"', '""')
-            cursor.execute(f'SELECT count(*) FROM "{safe_table}";')
-            count = cursor.fetchone()[0]
-            st.write(f"- {table} ({count} rows)")
+    st.write("**Tables:**")
+    for table, count in get_schema_summary(Config.Path.DATABASE_PATH.stat().st_mtime):
+        st.write(f"- {table} (~{count} rows)")
 
 if "messages" not in st.session_state:
     st.session_state.messages = create_history()
@@ -126,7 +229,8 @@ if prompt := st.chat_input("Masukkan pertanyaan Anda..."):
     
     with st.chat_message("assistant", avatar="🤖"):
         with st.spinner(random.choice(LOADING_MESSAGES)):
-            response = ask(prompt, st.session_state.messages, get_model())
-            st.markdown(response)
+            response = st.write_stream(
+                ask_stream(prompt, st.session_state.messages, get_model())
+            )
             st.session_state.messages.append(HumanMessage(content=prompt))
             st.session_state.messages.append(AIMessage(content=response))
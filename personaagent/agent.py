@@ -1,24 +1,39 @@
+import asyncio
 import os
+import re
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List
 
+import streamlit as st
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_ollama import OllamaEmbeddings  # Impor baru
 from langchain_chroma import Chroma
 
 from personaagent.logging import green_border_style, log_panel
+from personaagent.retrieval import InMemoryRetriever
 from personaagent.tools import call_tool
 from personaagent.config import Config
 
 os.makedirs(Config.Path.VECTORS_DIR, exist_ok=True)
-# Inisialisasi embeddings dan vector store sebagai variabel global
-embeddings = OllamaEmbeddings(model="mxbai-embed-large")
-vector_store = Chroma(
-    collection_name="northwind",
-    persist_directory=str(Config.Path.VECTORS_DIR),
-    embedding_function=embeddings
-)
+
+
+@st.cache_resource(show_spinner=False)
+def get_vector_store():
+    """Singleton embeddings + Chroma store + retriever, aman terhadap hot-reload.
+
+    st.cache_resource menjamin inisialisasi hanya sekali per proses, walau
+    modul ini di-reimport oleh Streamlit; vektor koleksi dimuat ke memori
+    supaya pencarian tidak lewat jalur query Chroma tiap request.
+    """
+    embeddings = OllamaEmbeddings(model=Config.EMBEDDING_MODEL)
+    vector_store = Chroma(
+        collection_name="northwind",
+        persist_directory=str(Config.Path.VECTORS_DIR),
+        embedding_function=embeddings
+    )
+    retriever = InMemoryRetriever(vector_store, embeddings, k=Config.RETRIEVAL_K)
+    return embeddings, vector_store, retriever
 
 
 SYSTEM_PROMPT = f"""
@@ -47,34 +62,101 @@ Your target audience is business analysts and data scientists who may not be fam
 def create_history() -> List[BaseMessage]:
     return [SystemMessage(content=SYSTEM_PROMPT)]
 
-def ask(
-    query: str, history: List[BaseMessage], llm: BaseChatModel, max_iterations: int = 20
-) -> str:
-    log_panel(title="User Request", content=f"Query: {query}", border_style=green_border_style)
 
-    # Buat retriever untuk mencari dokumen relevan
-    retriever = vector_store.as_retriever(search_kwargs={"k": 10})
+def _trim_history(history: List[BaseMessage]) -> List[BaseMessage]:
+    # Prompt Ollama dibayar per token tiap giliran; cukup kirim system prompt
+    # plus beberapa pesan terakhir, bukan seluruh riwayat sesi
+    system = [m for m in history if isinstance(m, SystemMessage)]
+    recent = [m for m in history if not isinstance(m, SystemMessage)]
+    return system + recent[-Config.MAX_HISTORY_MESSAGES:]
+
+
+_THINK_RE = re.compile(r"<think>.*?</think>\s*", re.DOTALL)
 
-    # Ambil dokumen relevan berdasarkan query
-    relevant_docs = retriever.get_relevant_documents(query)
-    context = "\n".join([doc.page_content for doc in relevant_docs])
+
+def _strip_think(text: str) -> str:
+    # Blok reasoning internal model thinking tidak untuk ditampilkan ke user
+    # maupun disimpan di riwayat chat
+    return _THINK_RE.sub("", text).strip()
+
+
+def _cap_tool_result(message: BaseMessage) -> BaseMessage:
+    limit = Config.MAX_TOOL_RESULT_CHARS
+    if isinstance(message.content, str) and len(message.content) > limit:
+        message.content = message.content[:limit] + "\n... (output dipotong)"
+    return message
+
+async def ask(
+    query: str, history: List[BaseMessage], llm: BaseChatModel, max_iterations: int = 20
+) -> AsyncIterator[str]:
+    # Mulai retrieval sedini mungkin di worker thread: embedding query lewat
+    # Ollama itu blocking, jadi jangan menahan event loop sementara kita
+    # menyiapkan riwayat pesan
+    _, _, retriever = get_vector_store()
+    retrieval_task = asyncio.create_task(asyncio.to_thread(retriever.invoke, query))
+
+    log_panel(title="User Request", content=f"Query: {query}", border_style=green_border_style)
+    messages = _trim_history(history)
+
+    # Ambil dokumen relevan berdasarkan query; batasi ukurannya supaya prefill
+    # Ollama tidak membengkak — dokumen paling relevan datang lebih dulu
+    relevant_docs = await retrieval_task
+    context_parts, total_chars = [], 0
+    for doc in relevant_docs:
+        snippet = doc.page_content[:Config.MAX_DOC_CHARS]
+        if total_chars + len(snippet) > Config.MAX_CONTEXT_CHARS:
+            break
+        context_parts.append(snippet)
+        total_chars += len(snippet)
+    context = "\n".join(context_parts)
 
     # Gabungkan konteks dokumen dengan pertanyaan pengguna
     contextualized_query = f"Konteks Dokumen:\n{context}\n\nPertanyaan Pengguna: {query}"
 
     n_iterations = 0
-    messages = history.copy()
     messages.append(HumanMessage(content=contextualized_query))
 
     while n_iterations < max_iterations:
-        response = llm.invoke(messages)
+        # Stream tiap giliran model. Model thinking seperti qwen3 mengalirkan
+        # blok <think> lebih dulu; giliran tool call hanya berisi blok itu,
+        # jadi konten SETELAH </think> adalah jawaban dan boleh langsung
+        # di-yield token demi token — selama belum ada tool_call_chunk
+        response = None
+        pending = ""
+        streaming_live = False
+        async for chunk in llm.astream(messages):
+            response = chunk if response is None else response + chunk
+            if response.tool_call_chunks or response.tool_calls:
+                # giliran tool call: tahan semua konten
+                streaming_live = False
+                continue
+            if not chunk.content:
+                continue
+            if streaming_live:
+                yield chunk.content
+                continue
+            pending += chunk.content
+            if "</think>" in pending:
+                tail = pending.split("</think>", 1)[1].lstrip()
+                if tail:
+                    yield tail
+                pending = ""
+                streaming_live = True
         messages.append(response)
         if not response.tool_calls:
-            # Pastikan output akhir adalah Markdown yang terformat
-            return response.content
-        for tool_call in response.tool_calls:
-            response = call_tool(tool_call)
-            messages.append(response)
+            if not streaming_live:
+                # blok <think> tidak pernah tertutup (atau tidak ada sama
+                # sekali); flush jawaban yang tertahan sekarang
+                answer = _strip_think(pending)
+                if answer:
+                    yield answer
+            return
+        # Tiap tool membuka koneksi SQLite sendiri dan independen satu sama lain,
+        # jadi aman dijalankan paralel; to_thread mencegah sqlite memblokir event loop
+        tool_messages = await asyncio.gather(
+            *[asyncio.to_thread(call_tool, tool_call) for tool_call in response.tool_calls]
+        )
+        messages.extend(_cap_tool_result(m) for m in tool_messages)
         n_iterations += 1
 
     raise RuntimeError(
@@ -5,8 +5,14 @@ from pathlib import Path
 class Config:
     SEED = 42
     MODEL_NAME      = "qwen3:1.7b"
+    EMBEDDING_MODEL = "bge-small-en-v1.5"   # 384-d, jauh lebih ringan dari mxbai-embed-large
     TEMPERATURE     = 0.5
     CONTEXT_WINDOW  = 4096
+    RETRIEVAL_K     = 10
+    MAX_HISTORY_MESSAGES  = 12      # pesan non-system terakhir yang dikirim ke LLM
+    MAX_TOOL_RESULT_CHARS = 4000    # batas panjang konten ToolMessage per panggilan
+    MAX_DOC_CHARS         = 500     # batas panjang per dokumen hasil retrieval
+    MAX_CONTEXT_CHARS     = 2000    # batas total konteks retrieval per prompt
 
     class Path:
         APP_HOME        = Path(__file__).parent.parent
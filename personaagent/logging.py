@@ -1,3 +1,6 @@
+import os
+import re
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.style import Style
@@ -7,10 +10,20 @@ green_border_style = Style(color="#10B981")
 
 console = Console()
 
+# Regex dikompilasi sekali; tiga kali .upper() + substring search per panggilan
+# terlalu mahal untuk jalur tool loop
+_SQL_RE = re.compile(r"\b(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+# Set OBROLDB_LOG=0 untuk mematikan logging terminal sepenuhnya (I/O rich
+# panel bisa memblokir proses di produksi)
+_LOG_ENABLED = os.environ.get("OBROLDB_LOG", "1") != "0"
+
 
 def log(
     content: str,
 ):
+    if not _LOG_ENABLED:
+        return
     console.log(content)
 
 
@@ -19,10 +32,12 @@ def log_panel(
     content: str,
     border_style: Style = blue_border_style,
 ):
+    if not _LOG_ENABLED:
+        return
     # Filter konten untuk menghapus query SQL jika ada
-    if "SELECT" in content.upper() or "INSERT" in content.upper() or "UPDATE" in content.upper() or "DELETE" in content.upper():
+    if _SQL_RE.search(content):
         content = "SQL query executed (details hidden for security)."
-    
+
     console.log(
         Panel(
             content,
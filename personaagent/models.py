@@ -1,7 +1,18 @@
+import httpx
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_ollama import ChatOllama
 from personaagent.config import Config
 
+# Pool koneksi keep-alive supaya loop agent (bisa 20+ request Ollama per
+# giliran) tidak membayar handshake TCP di tiap panggilan
+_CLIENT_KWARGS = {
+    "limits": httpx.Limits(
+        max_keepalive_connections=40,
+        max_connections=100,
+        keepalive_expiry=30.0,
+    ),
+}
+
 def create_llm() -> BaseChatModel:
     return ChatOllama(
         model=Config.MODEL_NAME,
@@ -10,4 +21,5 @@ def create_llm() -> BaseChatModel:
         verbose=False,
         keep_alive=-1,
         streaming=True,
-    )
\ No newline at end of file
+        client_kwargs=_CLIENT_KWARGS,
+    )
@@ -0,0 +1,47 @@
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class InMemoryRetriever:
+    """
+    Brute-force cosine search over vectors loaded once from Chroma.
+
+    Korpusnya kecil (konteks skema satu database), jadi dot-product numpy di
+    memori jauh lebih cepat daripada jalur query Chroma per request; Chroma
+    tetap dipakai sebagai penyimpanan persisten.
+    """
+
+    def __init__(self, vector_store, embeddings, k: int):
+        self._embeddings = embeddings
+        self._k = k
+        data = vector_store.get(include=["embeddings", "documents", "metadatas"])
+        self._documents = data["documents"] or []
+        self._metadatas = data["metadatas"] or [None] * len(self._documents)
+        vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        if vectors.size:
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._vectors = vectors
+
+    def _ensure_dim(self, dim: int) -> None:
+        # Koleksi lama mungkin dibangun dengan model embedding lain (dimensi
+        # beda); re-embed dokumen sekali dengan model aktif lalu pakai terus
+        if self._vectors.size and self._vectors.shape[1] != dim:
+            vectors = np.asarray(
+                self._embeddings.embed_documents(self._documents), dtype=np.float32
+            )
+            self._vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def invoke(self, query: str) -> List[Document]:
+        if not self._documents:
+            return []
+        query_vec = np.asarray(self._embeddings.embed_query(query), dtype=np.float32)
+        query_vec = query_vec / (np.linalg.norm(query_vec) or 1.0)
+        self._ensure_dim(query_vec.shape[0])
+        scores = self._vectors @ query_vec
+        top = np.argsort(scores)[::-1][: self._k]
+        return [
+            Document(page_content=self._documents[i], metadata=self._metadatas[i] or {})
+            for i in top
+        ]
@@ -1,7 +1,8 @@
+import functools
 import sqlite3
+import threading
 from contextlib import contextmanager
 from typing import Any, List
-import pandas as pd
 from langchain.tools import tool
 from langchain_core.messages import ToolMessage
 from langchain_core.messages.tool import ToolCall
@@ -12,16 +13,14 @@ from personaagent.logging import log, log_panel
 
 
 def get_available_tools() -> List[BaseTool]:
-    return [
-        list_tables,
-        get_columns,
-        count_rows,
-        describe_table,
-        sample_table,
-        get_primary_keys,
-        get_foreign_keys,
-        execute_sql,
-    ]
+    """
+    Return the shared tool list built once at import.
+
+    Returns:
+        The module-level list of BaseTool instances; callers always get the
+        same objects, so bind_tools and the dispatch map agree on identity.
+    """
+    return _AVAILABLE_TOOLS
 
 def call_tool(tool_call: ToolCall) -> Any:
     """
@@ -33,37 +32,141 @@ def call_tool(tool_call: ToolCall) -> Any:
     Returns:
         A ToolMessage containing the tool's output and its call ID.
     """
-    tools_by_name = {t.name: t for t in get_available_tools()}
-    tool = tools_by_name[tool_call["name"]]
+    tool = _TOOLS_BY_NAME[tool_call["name"]]
     result = tool.invoke(tool_call["args"])
-    id_key = next((k for k in tool_call.keys() if "id" in k.lower()), None)
-    call_id = str(tool_call.get(id_key, ""))
+    call_id = str(tool_call.get("id") or "")
     return ToolMessage(content=result, tool_call_id=call_id)
 
+# Satu koneksi per thread, dibuka sekali dan dipakai ulang; connect/teardown
+# per tool call terlalu mahal untuk loop agent yang memanggil banyak tool
+_local = threading.local()
+
+
+def _get_connection() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        # isolation_level default (deferred) dipertahankan: jalur readonly
+        # mengandalkan rollback untuk membuang tulisan yang tidak diminta
+        conn = sqlite3.connect(
+            Config.Path.DATABASE_PATH,
+            check_same_thread=False,
+        )
+        conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA mmap_size=268435456;"
+            "PRAGMA cache_size=-65536;"
+        )
+        _local.conn = conn
+    return conn
+
+
 @contextmanager
 def with_sql_cursor(readonly: bool = True):
     """
     Provide a SQLite cursor in a context manager.
 
+    The underlying connection is cached per thread and kept open; only the
+    cursor is closed on exit.
+
     Args:
-        readonly: If False, commit changes; otherwise do not commit.
+        readonly: If False, commit changes; otherwise roll back so any
+            writes issued through this cursor are discarded.
 
     Yields:
         A sqlite3.Cursor connected to the configured database.
     """
-    conn = sqlite3.connect(Config.Path.DATABASE_PATH)
+    conn = _get_connection()
     cur = conn.cursor()
     try:
         yield cur
-        if not readonly:
+        if readonly:
+            # koneksi dipakai ulang, jadi transaksi implisit harus dibuang
+            # eksplisit; dulu conn.close() yang melakukannya
+            conn.rollback()
+        else:
             conn.commit()
     except:
-        if not readonly:
-            conn.rollback()
+        conn.rollback()
         raise
     finally:
         cur.close()
-        conn.close()
+
+def format_markdown_table(columns: List[str], rows: List[tuple]) -> str:
+    """
+    Render query results as a Markdown table without pandas.
+
+    Args:
+        columns: Column names, one per result column.
+        rows: Result rows as returned by cursor.fetchall().
+
+    Returns:
+        A Markdown table string with columns padded to equal width.
+    """
+    cells = [[str(value) for value in row] for row in rows]
+    widths = [
+        max(len(col), *(len(row[i]) for row in cells)) if cells else len(col)
+        for i, col in enumerate(columns)
+    ]
+    header = "| " + " | ".join(col.ljust(w) for col, w in zip(columns, widths)) + " |"
+    separator = "|" + "|".join("-" * (w + 2) for w in widths) + "|"
+    body = [
+        "| " + " | ".join(cell.ljust(w) for cell, w in zip(row, widths)) + " |"
+        for row in cells
+    ]
+    return "\n".join([header, separator, *body])
+
+
+@functools.lru_cache(maxsize=256)
+def _table_info(table_name: str, db_mtime: float) -> tuple:
+    """
+    Run PRAGMA table_info once per (table, db mtime) and cache the rows.
+
+    Args:
+        table_name: Exact name of the table.
+        db_mtime: Database file mtime; a changed file invalidates the entry.
+
+    Returns:
+        PRAGMA table_info rows as an immutable tuple of tuples.
+    """
+    with with_sql_cursor() as cursor:
+        cursor.execute("SELECT * FROM pragma_table_info(?);", (table_name,))
+        return tuple(cursor.fetchall())
+
+
+def _cached_table_info(table_name: str) -> tuple:
+    return _table_info(table_name, Config.Path.DATABASE_PATH.stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=16)
+def _known_tables(db_mtime: float) -> frozenset:
+    with with_sql_cursor() as cursor:
+        # view ikut masuk: count_rows/sample_table sah dipakai pada view
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view');")
+        return frozenset(row[0] for row in cursor.fetchall())
+
+
+def _validate_table(table_name: str) -> str:
+    """
+    Check a table name against the schema and return it safely quoted.
+
+    Identifier tidak bisa dipakai sebagai parameter `?`, jadi nama tabel
+    divalidasi dulu terhadap sqlite_master sebelum diinterpolasi.
+
+    Args:
+        table_name: Exact name of the table.
+
+    Returns:
+        The table name with double quotes escaped, ready for interpolation.
+
+    Raises:
+        ValueError: If the table does not exist in the database.
+    """
+    if table_name not in _known_tables(Config.Path.DATABASE_PATH.stat().st_mtime):
+        raise ValueError(f"Unknown table: {table_name}")
+    return table_name.replace('"', '""')
+
 
 @tool(parse_docstring=True)
 def list_tables(reasoning: str = "") -> str:
@@ -107,11 +210,8 @@ def get_columns(table_name: str, reasoning: str = "") -> str:
         Comma-separated list of column names.
     """
     log_panel(title="Get Columns", content=f"Reasoning: {reasoning}")
-    safe = table_name.replace('"', '""')
     try:
-        with with_sql_cursor() as cursor:
-            cursor.execute(f'PRAGMA table_info("{safe}");')
-            cols = [row[1] for row in cursor.fetchall()]
+        cols = [row[1] for row in _cached_table_info(table_name)]
         return ", ".join(cols)
     except Exception as e:
         log(f"[red]Error getting columns: {e}[/red]")
@@ -130,8 +230,8 @@ def count_rows(table_name: str, reasoning: str = "") -> str:
         Total row count as a string.
     """
     log_panel(title="Count Rows", content=f"Reasoning: {reasoning}")
-    safe = table_name.replace('"', '""')
     try:
+        safe = _validate_table(table_name)
         with with_sql_cursor() as cursor:
             cursor.execute(f'SELECT COUNT(*) FROM "{safe}";')
             count = cursor.fetchone()[0]
@@ -153,11 +253,8 @@ def describe_table(table_name: str, reasoning: str = "") -> str:
         One row per column from PRAGMA table_info as tuples.
     """
     log_panel(title="Describe Table", content=f"Reasoning: {reasoning}")
-    safe = table_name.replace('"', '""')
     try:
-        with with_sql_cursor() as cursor:
-            cursor.execute(f'PRAGMA table_info("{safe}");')
-            rows = cursor.fetchall()
+        rows = _cached_table_info(table_name)
         return "\n".join(str(row) for row in rows)
     except Exception as e:
         log(f"[red]Error describing table: {e}[/red]")
@@ -177,17 +274,16 @@ def sample_table(reasoning: str = "", table_name: str = "", row_sample_size: int
         A string containing a table representation and insights.
     """
     log_panel(title="Sample Table", content=f"Reasoning: {reasoning}")
-    safe = table_name.replace('"', '""')
     try:
+        safe = _validate_table(table_name)
         with with_sql_cursor() as cursor:
-            cursor.execute(f'SELECT * FROM "{safe}" LIMIT {row_sample_size};')
+            cursor.execute(f'SELECT * FROM "{safe}" LIMIT ?;', (row_sample_size,))
             rows = cursor.fetchall()
             columns = [desc[0] for desc in cursor.description]
         
-        df = pd.DataFrame(rows, columns=columns)
-        table_str = df.to_markdown(index=False)
-        
-        insight = f"**Insight:** Menampilkan {len(df)} baris sampel dari tabel {table_name}. "
+        table_str = format_markdown_table(columns, rows)
+
+        insight = f"**Insight:** Menampilkan {len(rows)} baris sampel dari tabel {table_name}. "
         insight += "Data ini memberikan gambaran awal tentang isi tabel."
         
         return f"{table_str}\n\n{insight}"
@@ -208,10 +304,7 @@ def get_primary_keys(table_name: str, reasoning: str = "") -> str:
         Comma-separated primary key column names.
     """
     log_panel(title="Get Primary Keys", content=f"Reasoning: {reasoning}")
-    safe = table_name.replace('"', '""')
-    with with_sql_cursor() as cursor:
-        cursor.execute(f'PRAGMA table_info("{safe}");')
-        rows = cursor.fetchall()
+    rows = _cached_table_info(table_name)
     pks = [col[1] for col in rows if col[5] > 0 or col[1].endswith("ID")]
     return ", ".join(pks)
 
@@ -228,9 +321,8 @@ def get_foreign_keys(table_name: str, reasoning: str = "") -> str:
         One constraint per line in the format 'from_col → to_table.to_col'.
     """
     log_panel(title="Get Foreign Keys", content=f"Reasoning: {reasoning}")
-    safe = table_name.replace('"', '""')
     with with_sql_cursor() as cursor:
-        cursor.execute(f'PRAGMA foreign_key_list("{safe}");')
+        cursor.execute("SELECT * FROM pragma_foreign_key_list(?);", (table_name,))
         rows = cursor.fetchall()
     lines = [f"{r[3]} → {r[2]}.{r[4]}" for r in rows]
     return "\n".join(lines)
@@ -255,15 +347,12 @@ def execute_sql(reasoning: str = "", sql_query: str = "") -> str:
             # Ambil nama kolom dari cursor
             columns = [desc[0] for desc in cursor.description]
         
-        # Konversi hasil ke DataFrame
-        df = pd.DataFrame(rows, columns=columns)
-        
         # Buat representasi tabel dalam Markdown
-        table_str = df.to_markdown(index=False)
-        
+        table_str = format_markdown_table(columns, rows)
+
         # Generate insight sederhana berdasarkan hasil
-        insight = f"**Insight:** Query menghasilkan {len(df)} baris data. "
-        if len(df) > 0:
+        insight = f"**Insight:** Query menghasilkan {len(rows)} baris data. "
+        if len(rows) > 0:
             insight += f"Data menunjukkan informasi relevan dari tabel {columns[0]} dan kolom terkait."
         else:
             insight += "Tidak ada data yang ditemukan untuk permintaan ini."
@@ -271,3 +360,17 @@ def execute_sql(reasoning: str = "", sql_query: str = "") -> str:
         return f"{table_str}\n\n{insight}"
     except Exception:
         return "An error occurred when executing the query. Please check your request."
+
+
+# Daftar tool dan peta dispatch dibangun sekali saat import, bukan per panggilan
+_AVAILABLE_TOOLS: List[BaseTool] = [
+    list_tables,
+    get_columns,
+    count_rows,
+    describe_table,
+    sample_table,
+    get_primary_keys,
+    get_foreign_keys,
+    execute_sql,
+]
+_TOOLS_BY_NAME = {t.name: t for t in _AVAILABLE_TOOLS}